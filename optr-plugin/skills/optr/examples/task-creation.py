@@ -6,47 +6,57 @@ This demonstrates how to convert plan items into TaskCreate calls.
 Not meant to be executed directly - use Claude's TaskCreate tool instead.
 """
 
+# Imperative prefix -> present continuous prefix, used for activeForm
+_PREFIX_MAP = (
+    ('Add ', 'Adding '),
+    ('Implement ', 'Implementing '),
+    ('Create ', 'Creating '),
+    ('Fix ', 'Fixing '),
+    ('Build ', 'Building '),
+)
+
+
 def parse_plan_to_tasks(plan_content):
     """
     Parse PLAN.md content and extract task items.
 
     Args:
-        plan_content: Raw text content of PLAN.md
+        plan_content: Raw text content of PLAN.md, or an iterable of its
+            lines (e.g. an open file handle)
 
     Returns:
         List of task dictionaries with subject, description, activeForm
     """
     tasks = []
-    lines = plan_content.split('\n')
+    lines = plan_content.splitlines() if isinstance(plan_content, str) else plan_content
     current_section = None
 
     for line in lines:
-        line = line.strip()
+        line = line.lstrip()
+
+        # Most lines are prose or blank; skip them with a single char test
+        if not line or line[0] not in '#-':
+            continue
+        line = line.rstrip()
 
         # Track section for context
         if line.startswith('##'):
-            current_section = line.replace('##', '').strip()
+            current_section = line.lstrip('#').strip()
 
         # Extract task items (marked with -)
-        if line.startswith('- [ ]') or line.startswith('-'):
-            # Extract task description
-            task_text = line.replace('- [ ]', '').replace('-', '').strip()
+        elif line.startswith('- '):
+            # Extract task description (strip only the bullet prefix)
+            task_text = (line[5:] if line.startswith('- [ ]') else line[2:]).strip()
 
             # Clean up task text
             if task_text:
                 # Create active form (present continuous)
                 # "Implement feature" -> "Implementing feature"
                 active_form = task_text
-                if active_form.startswith('Add'):
-                    active_form = 'Adding ' + active_form[3:].lstrip()
-                elif active_form.startswith('Implement'):
-                    active_form = 'Implementing ' + active_form[9:].lstrip()
-                elif active_form.startswith('Create'):
-                    active_form = 'Creating ' + active_form[6:].lstrip()
-                elif active_form.startswith('Fix'):
-                    active_form = 'Fixing ' + active_form[3:].lstrip()
-                elif active_form.startswith('Build'):
-                    active_form = 'Building ' + active_form[5:].lstrip()
+                for prefix, replacement in _PREFIX_MAP:
+                    if task_text.startswith(prefix):
+                        active_form = replacement + task_text[len(prefix):].lstrip()
+                        break
 
                 # Build subject (imperative form)
                 subject = task_text
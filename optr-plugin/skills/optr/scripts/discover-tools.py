@@ -7,6 +7,7 @@ Scans available skills/agents/commands and matches them to PLAN.md content.
 Usage:
     python scripts/discover-tools.py [path/to/PLAN.md]
     python scripts/discover-tools.py --yes [path/to/PLAN.md]  # Auto-search marketplace
+    python scripts/discover-tools.py --no [path/to/PLAN.md]   # Local tools only, no prompt
 
 This script:
 1. Scans project-local directories (.claude/skills, skills/, etc.)
@@ -16,60 +17,183 @@ This script:
 5. Outputs final list with install commands
 """
 
+import heapq
+import importlib.util
+import os
 import sys
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # Force unbuffered output for better visibility in Claude CLI
 sys.stdout.reconfigure(line_buffering=True) if hasattr(sys.stdout, 'reconfigure') else None
 
+# The keyword pattern is compiled on first use (see _get_plan_keywords_re)
+# so early-exit paths skip the compile cost
+_RE_PLAN_KEYWORDS = None
+
+# Plan keywords (terms, then verbs), matched in a single pass over PLAN.md
+_PLAN_KEYWORDS = (
+    'skill', 'plugin', 'agent', 'command', 'hook',
+    'frontend', 'backend', 'UI', 'interface',
+    'API', 'database', 'test', 'review',
+    'CLAUDE.md', 'documentation', 'deploy',
+    'create', 'build', 'implement', 'design', 'add', 'update',
+)
+# (keyword, lowercased keyword) pairs, normalized once for matching
+_PLAN_KEYWORDS_LOWER = tuple((keyword, keyword.lower()) for keyword in _PLAN_KEYWORDS)
+
+# Project-local directories to scan, the bucket each one feeds, and how
+# deep to search. Agents and commands sit at the top level or one
+# namespace directory down; skills live in their own nested directories.
+_PROJECT_TOOL_DIRS = (
+    ('.claude/skills', 'skills', None),
+    ('skills', 'skills', None),
+    ('.claude/agents', 'agents', 1),
+    ('agents', 'agents', 1),
+    ('.claude/commands', 'commands', 1),
+    ('commands', 'commands', 1),
+)
+
+# Directories that never hold tools, skipped during scans
+_SCAN_PRUNE_DIRS = frozenset({
+    '.git', 'node_modules', '.venv', 'venv', '__pycache__',
+    '.mypy_cache', '.ruff_cache', '.pytest_cache', '.tox',
+})
+
+# Deepest directory level below a scan root that is searched; plugin
+# caches nest skills around six levels down
+_SCAN_MAX_DEPTH = 10
+
+# Bytes read from each tool file; frontmatter and the first
+# description line sit at the top
+_HEAD_READ_BYTES = 8192
+
+# Number of local matches shown in phase 1
+_LOCAL_MATCH_DISPLAY_LIMIT = 10
+
+# Upper bound on threads for concurrent tool file parsing
+_PARSE_WORKERS = 16
+
+# Globally installed plugins; a plain str since os.scandir takes it as-is
+_PLUGINS_PATH = str(Path.home() / '.claude' / 'plugins')
+
+# Sibling match_plugins module, loaded by path on first use
+_MATCH_PLUGINS = None
+
+# Parsed tool metadata keyed by file and mtime, reused across runs
+_PARSE_CACHE_PATH = Path.home() / '.cache' / 'optr' / 'tool-cache.json'
+_PARSE_CACHE_MAX_ENTRIES = 4096
+# Bump when the parser output changes; caches from other versions are discarded whole
+_PARSE_CACHE_VERSION = 2
+
+
+def _get_plan_keywords_re():
+    """Return the compiled plan keyword alternation, compiling it once."""
+    global _RE_PLAN_KEYWORDS
+    if _RE_PLAN_KEYWORDS is None:
+        _RE_PLAN_KEYWORDS = re.compile(
+            r'\b(' + _trie_pattern(_PLAN_KEYWORDS) + r')\b',
+            re.IGNORECASE
+        )
+    return _RE_PLAN_KEYWORDS
+
+
+def _trie_pattern(words):
+    """
+    Build a prefix-factored regex alternation for words.
+
+    Shared prefixes are emitted once (e.g. 'a(?:dd|gent|pi)'), so the
+    regex engine walks a trie instead of retrying every alternative at
+    each position of the scanned text.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word.lower():
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def render(node):
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        group = '(?:' + '|'.join(branches) + ')'
+        return group + '?' if '' in node else group
+
+    return render(trie)
+
+
+def _load_match_plugins(verbose: bool = False):
+    """Import the sibling match_plugins module, or return None if unavailable."""
+    global _MATCH_PLUGINS
+    if _MATCH_PLUGINS is not None:
+        return _MATCH_PLUGINS
+
+    match_plugins_path = Path(__file__).parent / 'match_plugins.py'
+
+    if not match_plugins_path.exists():
+        if verbose:
+            print(f"Warning: match_plugins.py not found at {match_plugins_path}")
+        return None
+
+    # Load straight from the file rather than prepending to sys.path
+    try:
+        spec = importlib.util.spec_from_file_location('match_plugins', match_plugins_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    except ImportError as e:
+        if verbose:
+            print(f"Warning: Could not import match_plugins module: {e}")
+        return None
+    _MATCH_PLUGINS = module
+    return module
+
+
+def fetch_marketplace_plugins(verbose: bool = False) -> List[Dict[str, Any]]:
+    """Fetch the marketplace plugin list (empty if match_plugins is unavailable)."""
+    try:
+        match_plugins = _load_match_plugins(verbose)
+        return match_plugins.get_available_plugins() if match_plugins else []
+    except Exception as e:
+        if verbose:
+            print(f"Warning: Error listing marketplace plugins: {e}")
+        return []
+
 
 def search_marketplace_for_plugins(
-    plan_path: Path,
+    plan_content: str,
     threshold: float = 0.5,
-    verbose: bool = False
+    verbose: bool = False,
+    plugins: Optional[List[Dict[str, Any]]] = None
 ) -> List[Dict[str, Any]]:
     """
     Search the Claude marketplace for plugins using semantic matching.
 
     Args:
-        plan_path: Path to the PLAN.md file
+        plan_content: Content of the PLAN.md file
         threshold: Minimum relevance score for including a plugin
         verbose: Print debug information
+        plugins: Pre-fetched marketplace plugin list (fetched here if None)
 
     Returns:
         List of matched marketplace plugins with install commands
     """
     try:
-        # Get the directory of this script
-        script_dir = Path(__file__).parent
-        match_plugins_path = script_dir / 'match_plugins.py'
-
-        if not match_plugins_path.exists():
-            if verbose:
-                print(f"Warning: match_plugins.py not found at {match_plugins_path}")
-            return []
-
-        # Import the module
-        sys.path.insert(0, str(script_dir))
-
-        try:
-            from match_plugins import (
-                get_available_plugins,
-                match_plugins_with_claude
-            )
-        except ImportError as e:
-            if verbose:
-                print(f"Warning: Could not import match_plugins module: {e}")
+        match_plugins = _load_match_plugins(verbose)
+        if not match_plugins:
             return []
 
-        # Read plan content
-        plan_content = plan_path.read_text()
-
         # Get available plugins
-        plugins = get_available_plugins()
+        if plugins is None:
+            plugins = match_plugins.get_available_plugins()
 
         if verbose:
             print(f"   Found {len(plugins)} marketplace plugins")
@@ -78,7 +202,7 @@ def search_marketplace_for_plugins(
             return []
 
         # Match plugins using Claude API
-        matched = match_plugins_with_claude(
+        matched = match_plugins.match_plugins_with_claude(
             plan_content=plan_content,
             plugins=plugins,
             threshold=threshold,
@@ -88,16 +212,10 @@ def search_marketplace_for_plugins(
         # Convert to expected format with 'type' field
         for plugin in matched:
             if 'type' not in plugin:
-                # Detect type from name/description
-                name_lower = plugin.get('name', '').lower()
-                desc_lower = plugin.get('description', '').lower()
-
-                if 'command' in name_lower or 'slash' in desc_lower:
-                    plugin['type'] = 'command'
-                elif 'agent' in name_lower:
-                    plugin['type'] = 'agent'
-                else:
-                    plugin['type'] = 'skill'
+                plugin['type'] = detect_tool_type(
+                    plugin.get('name', ''),
+                    plugin.get('description', '')
+                )
 
         return matched
 
@@ -107,73 +225,227 @@ def search_marketplace_for_plugins(
         return []
 
 
-def scan_tools():
-    """Scan Claude plugins directory for available tools."""
-    tools = {'skills': [], 'agents': [], 'commands': []}
-    plugins_path = Path.home() / '.claude' / 'plugins'
+def _load_parse_cache():
+    """Load the on-disk parse cache, or an empty one if unavailable."""
+    try:
+        with open(_PARSE_CACHE_PATH, 'r') as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or data.get('version') != _PARSE_CACHE_VERSION:
+            return {}
+        cache = data.get('entries')
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_parse_cache(cache):
+    """Persist the parse cache atomically, keeping the most recent entries."""
+    for key in list(cache)[:max(0, len(cache) - _PARSE_CACHE_MAX_ENTRIES)]:
+        del cache[key]
+    try:
+        _PARSE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = _PARSE_CACHE_PATH.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': _PARSE_CACHE_VERSION, 'entries': cache}, f)
+        os.replace(tmp_path, _PARSE_CACHE_PATH)
+    except OSError:
+        pass
 
-    for skill_file in plugins_path.rglob('SKILL.md'):
-        tool_info = parse_skill_file(skill_file)
-        if tool_info:
-            tools['skills'].append(tool_info)
 
-    for agent_file in plugins_path.rglob('*-agent.md'):
-        tool_info = parse_agent_file(agent_file)
-        if tool_info:
-            tools['agents'].append(tool_info)
+def _parse_tool_files(jobs, source=None):
+    """
+    Parse (bucket, parser, DirEntry) jobs into tool buckets.
+
+    Files whose (mtime, size) match the parse cache are served from it;
+    only the misses are read, concurrently on a thread pool.
+    """
+    tools = {'skills': [], 'agents': [], 'commands': []}
+    if not jobs:
+        return tools
+
+    cache = _load_parse_cache()
+    results = [None] * len(jobs)
+    misses = []
 
-    for command_file in plugins_path.rglob('*-command.md'):
-        tool_info = parse_command_file(command_file)
+    for i, (bucket, parser, entry) in enumerate(jobs):
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        key = f"{bucket}:{entry.path}"
+        stamp = [stat.st_mtime_ns, stat.st_size]
+        # Pop and re-insert so recently seen files survive pruning
+        cached = cache.pop(key, None)
+        if cached and cached[:2] == stamp:
+            cache[key] = cached
+            results[i] = cached[2]
+        else:
+            misses.append((i, key, stamp, parser, entry.path))
+
+    if misses:
+        # File reads are I/O-bound, so overlap them across threads
+        with ThreadPoolExecutor(max_workers=min(_PARSE_WORKERS, len(misses))) as executor:
+            parsed = executor.map(lambda miss: miss[3](miss[4]), misses)
+            for (i, key, stamp, _, _), tool_info in zip(misses, parsed):
+                cache[key] = stamp + [tool_info]
+                results[i] = tool_info
+        _save_parse_cache(cache)
+
+    for (bucket, _, _), tool_info in zip(jobs, results):
         if tool_info:
-            tools['commands'].append(tool_info)
+            # Copy so callers can annotate without touching the cache
+            tool_info = dict(tool_info)
+            # Precompute the merge key once per tool
+            tool_info['_dedupe_key'] = (tool_info['type'], tool_info['name'].lower())
+            if source:
+                tool_info['source'] = source
+            tools[bucket].append(tool_info)
 
     return tools
 
 
+@lru_cache(maxsize=1024)
+def detect_tool_type(name, description):
+    """Detect a marketplace plugin's tool type from its name/description."""
+    name_lower = name.lower()
+    if 'command' in name_lower or 'slash' in description.lower():
+        return 'command'
+    if 'agent' in name_lower:
+        return 'agent'
+    return 'skill'
+
+
+def _iter_files(root, max_depth=_SCAN_MAX_DEPTH):
+    """
+    Yield a DirEntry for every file under root via os.scandir recursion.
+
+    Directories in _SCAN_PRUNE_DIRS are never entered, and recursion stops
+    max_depth levels below root.
+    """
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if max_depth > 0 and entry.name not in _SCAN_PRUNE_DIRS:
+                        yield from _iter_files(entry.path, max_depth - 1)
+                else:
+                    yield entry
+    except OSError:
+        return
+
+
+def scan_tools():
+    """Scan Claude plugins directory for available tools."""
+    jobs = []
+
+    # Single walk, dispatching each file to its bucket by name
+    for entry in _iter_files(_PLUGINS_PATH):
+        filename = entry.name
+        if filename == 'SKILL.md':
+            bucket, parser = 'skills', parse_skill_file
+        elif filename.endswith('-agent.md'):
+            bucket, parser = 'agents', parse_agent_file
+        elif filename.endswith('-command.md'):
+            bucket, parser = 'commands', parse_command_file
+        else:
+            continue
+        jobs.append((bucket, parser, entry))
+
+    return _parse_tool_files(jobs)
+
+
 def scan_project_tools():
     """Scan project-local directories for skills, agents, commands."""
-    tools = {'skills': [], 'agents': [], 'commands': []}
     project_root = Path.cwd()
-
-    for skill_dir in ['.claude/skills', 'skills']:
-        dir_path = project_root / skill_dir
-        if dir_path.exists():
-            for skill_file in dir_path.rglob('SKILL.md'):
-                tool_info = parse_skill_file(skill_file)
-                if tool_info:
-                    tool_info['source'] = 'project'
-                    tools['skills'].append(tool_info)
-
-    for agent_dir in ['.claude/agents', 'agents']:
-        dir_path = project_root / agent_dir
-        if dir_path.exists():
-            for agent_file in dir_path.rglob('*.md'):
-                if agent_file.name == 'SKILL.md':
-                    continue
-                tool_info = parse_agent_file(agent_file)
-                if tool_info:
-                    tool_info['source'] = 'project'
-                    tools['agents'].append(tool_info)
-
-    for command_dir in ['.claude/commands', 'commands']:
-        dir_path = project_root / command_dir
-        if dir_path.exists():
-            for command_file in dir_path.rglob('*.md'):
-                if command_file.name == 'SKILL.md':
+    jobs = []
+
+    for tool_dir, bucket, max_depth in _PROJECT_TOOL_DIRS:
+        if max_depth is None:
+            max_depth = _SCAN_MAX_DEPTH
+        for entry in _iter_files(project_root / tool_dir, max_depth):
+            filename = entry.name
+            if bucket == 'skills':
+                if filename != 'SKILL.md':
                     continue
-                tool_info = parse_command_file(command_file)
-                if tool_info:
-                    tool_info['source'] = 'project'
-                    tools['commands'].append(tool_info)
+                parser = parse_skill_file
+            elif not filename.endswith('.md') or filename == 'SKILL.md':
+                continue
+            elif bucket == 'agents':
+                parser = parse_agent_file
+            else:
+                parser = parse_command_file
+            jobs.append((bucket, parser, entry))
 
-    return tools
+    return _parse_tool_files(jobs, source='project')
+
+
+def _file_stem(path):
+    """Return the file name of path without its extension."""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _read_head_bytes(path, size=None):
+    """
+    Read at most size bytes of a file, trimmed to whole lines.
+
+    Uses a single os.open/os.read/os.close with no buffered file object.
+    Returns (data, truncated) where truncated is True if the file had
+    more content than was read.
+    """
+    size = size or _HEAD_READ_BYTES
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        data = os.read(fd, size + 1)
+    finally:
+        os.close(fd)
+    truncated = len(data) > size
+    if truncated:
+        # Drop the trailing partial line
+        cut = data.rfind(b'\n', 0, size)
+        data = data[:cut + 1] if cut >= 0 else data[:size]
+    return data, truncated
+
+
+def _read_head(path, size=None):
+    """
+    Decoded variant of _read_head_bytes, returning (text, truncated).
+
+    CRLF is folded to LF, matching what a text-mode read would give.
+    """
+    data, truncated = _read_head_bytes(path, size)
+    return data.decode('utf-8', 'replace').replace('\r\n', '\n'), truncated
+
+
+def _first_description_line(data):
+    """Return the first non-blank, non-heading line of data, decoding only it."""
+    for line in data.split(b'\n'):
+        if line.startswith(b'#'):
+            continue
+        text = line.decode('utf-8', 'replace').strip()
+        if text:
+            return text
+    return ''
+
+
+def _head_description(path):
+    """First description line from the file head, reading the rest only if the head has none."""
+    data, truncated = _read_head_bytes(path)
+    description = _first_description_line(data)
+    if not description and truncated:
+        with open(path, 'rb') as f:
+            description = _first_description_line(f.read())
+    return description
 
 
 def parse_skill_file(skill_path):
-    """Extract metadata from SKILL.md file."""
+    """Extract metadata from SKILL.md file (path may be str or PathLike)."""
     try:
-        content = skill_path.read_text()
+        content, truncated = _read_head(skill_path)
         metadata = extract_frontmatter(content)
+        if truncated and not metadata and content.startswith('---\n'):
+            # Frontmatter runs past the head; fall back to a full read
+            with open(skill_path, 'r') as f:
+                metadata = extract_frontmatter(f.read())
 
         if metadata.get('description'):
             return {
@@ -191,18 +463,13 @@ def parse_skill_file(skill_path):
 def parse_agent_file(agent_path):
     """Extract metadata from agent.md file."""
     try:
-        content = agent_path.read_text()
-        lines = content.split('\n')
-        description = ''
-        for line in lines:
-            if line.strip() and not line.startswith('#'):
-                description = line.strip()
-                break
+        # The description is the first non-heading line, so the head suffices
+        description = _head_description(agent_path)
 
         if description:
             return {
                 'type': 'agent',
-                'name': agent_path.stem,
+                'name': _file_stem(agent_path),
                 'description': description,
                 'path': str(agent_path),
                 'keywords': []
@@ -215,18 +482,13 @@ def parse_agent_file(agent_path):
 def parse_command_file(command_path):
     """Extract metadata from command.md file."""
     try:
-        content = command_path.read_text()
-        lines = content.split('\n')
-        description = ''
-        for line in lines:
-            if line.strip() and not line.startswith('#'):
-                description = line.strip()
-                break
+        # The description is the first non-heading line, so the head suffices
+        description = _head_description(command_path)
 
         if description:
             return {
                 'type': 'command',
-                'name': command_path.stem,
+                'name': _file_stem(command_path),
                 'description': description,
                 'path': str(command_path),
                 'keywords': []
@@ -238,120 +500,135 @@ def parse_command_file(command_path):
 
 def extract_frontmatter(content):
     """Extract YAML frontmatter from markdown."""
-    match = re.match(r'^---\n(.*?)\n---', content, re.DOTALL)
-    if match:
-        frontmatter = match.group(1)
-        metadata = {}
-        for line in frontmatter.split('\n'):
-            if ':' in line:
-                key, value = line.split(':', 1)
-                metadata[key.strip()] = value.strip().strip('"').strip("'")
-        return metadata
-    return {}
+    # Frontmatter sits at the head, so locate it by slicing rather than
+    # running a regex over the whole file
+    if not content.startswith('---\n'):
+        return {}
+    end = content.find('\n---', 4)
+    if end < 0:
+        return {}
+    metadata = {}
+    for line in content[4:end].splitlines():
+        # partition splits on the first colon in a single scan
+        key, sep, value = line.partition(':')
+        if sep:
+            metadata[key.strip()] = value.strip().strip('"').strip("'")
+    return metadata
 
 
 def extract_keywords_from_plan(plan_content):
     """Extract keywords from PLAN.md content."""
-    keywords = []
-    terms = [
-        'skill', 'plugin', 'agent', 'command', 'hook',
-        'frontend', 'backend', 'UI', 'interface',
-        'API', 'database', 'test', 'review',
-        'CLAUDE.md', 'documentation', 'deploy'
-    ]
-    verbs = ['create', 'build', 'implement', 'design', 'add', 'update']
-
-    content_lower = plan_content.lower()
-    for term in terms:
-        if term.lower() in content_lower:
-            keywords.append(term)
-    for verb in verbs:
-        if verb in content_lower:
-            keywords.append(verb)
-
-    return keywords
-
-
-def merge_and_score_tools(local_tools, online_tools, project_tools, plan_keywords):
-    """Merge all tools and score them."""
-    all_tools = []
+    hits = set()
+    for match in _get_plan_keywords_re().finditer(plan_content):
+        hits.add(match.group(1).lower())
+        # Stop scanning once every keyword has been seen
+        if len(hits) == len(_PLAN_KEYWORDS_LOWER):
+            break
+    return [keyword for keyword, keyword_lower in _PLAN_KEYWORDS_LOWER if keyword_lower in hits]
+
+
+def _iter_buckets(tools):
+    """Iterate skills, agents, then commands without concatenating the lists."""
+    return chain(tools.get('skills', ()), tools.get('agents', ()), tools.get('commands', ()))
+
+
+def _merge_tools(project_tools, local_tools, online_tools, merged_by_key=None):
+    """
+    Tag, score and deduplicate tools into a dict keyed by (type, name).
+
+    Tools are added in priority order (project, local, online) and the
+    first occurrence wins. Passing an earlier result as merged_by_key
+    extends it in place, so a later merge only adds the new tools.
+
+    Tool dicts are updated in place with their source and score rather
+    than copied; they are built fresh by this run's scanners, and
+    repeated merges assign the same values.
+    """
+    if merged_by_key is None:
+        merged_by_key = {}
+
+    def add(tool, source, score):
+        key = tool.get('_dedupe_key') or (tool.get('type', ''), tool.get('name', '').lower())
+        if key in merged_by_key:
+            return
+        if source:
+            tool['source'] = source
+        tool['score'] = score if score is not None else tool.get('relevance_score', 3)
+        merged_by_key[key] = tool
 
     # Add project tools (highest priority)
-    for tool in project_tools.get('skills', []) + project_tools.get('agents', []) + project_tools.get('commands', []):
-        t = dict(tool)
-        t['source'] = 'project'
-        t['score'] = 10
-        all_tools.append(t)
+    for tool in _iter_buckets(project_tools):
+        add(tool, 'project', 10)
 
     # Add local tools
-    for tool in local_tools.get('skills', []) + local_tools.get('agents', []) + local_tools.get('commands', []):
-        t = dict(tool)
-        t['source'] = 'local'
-        t['score'] = 5
-        all_tools.append(t)
+    for tool in _iter_buckets(local_tools):
+        add(tool, 'local', 5)
 
     # Add online tools
     for tool in online_tools:
-        t = dict(tool)
-        t['score'] = t.get('relevance_score', 3)
-        all_tools.append(t)
-
-    # Deduplicate
-    seen = set()
-    unique_tools = []
-    for tool in all_tools:
-        key = f"{tool.get('type', '')}:{tool.get('name', '').lower()}"
-        if key not in seen:
-            seen.add(key)
-            unique_tools.append(tool)
-
-    # Sort by score
-    unique_tools.sort(key=lambda x: x.get('score', 0), reverse=True)
+        add(tool, None, None)
+
+    return merged_by_key
+
+
+def _rank_tools(merged_by_key, top=None):
+    """
+    Return merged tools by descending score, or only the top highest.
+
+    Both paths are stable, so insertion (priority) order breaks ties.
+    """
+    if top is not None:
+        return heapq.nlargest(top, merged_by_key.values(), key=itemgetter('score'))
+    unique_tools = list(merged_by_key.values())
+    unique_tools.sort(key=itemgetter('score'), reverse=True)
     return unique_tools
 
 
+def _truncate(text, width=70):
+    """Return text cut to width characters, ending in '...' if shortened."""
+    return text if len(text) <= width else text[:width - 3] + '...'
+
+
 def print_local_matches(project_tools, local_tools, matched_tools):
     """Print matched local tools (project + global) and ask about marketplace search."""
-    # Force flush output to ensure it displays before input prompt
-    sys.stdout.flush()
-
-    print("\n" + "=" * 60)
-    print("🎯 Tool Discovery - Phase 1: Local Tools")
-    print("=" * 60)
-    sys.stdout.flush()
+    # Collect lines and emit them with a single write before the prompt
+    out = []
+    out.append("\n" + "=" * 60)
+    out.append("🎯 Tool Discovery - Phase 1: Local Tools")
+    out.append("=" * 60)
 
     # Show summary
-    print(f"\n📁 Project-local: {len(project_tools.get('skills', []))} skills, {len(project_tools.get('agents', []))} agents, {len(project_tools.get('commands', []))} commands")
-    print(f"📦 Global installed: {len(local_tools.get('skills', []))} skills, {len(local_tools.get('agents', []))} agents, {len(local_tools.get('commands', []))} commands")
-    sys.stdout.flush()
+    out.append(f"\n📁 Project-local: {len(project_tools.get('skills', []))} skills, {len(project_tools.get('agents', []))} agents, {len(project_tools.get('commands', []))} commands")
+    out.append(f"📦 Global installed: {len(local_tools.get('skills', []))} skills, {len(local_tools.get('agents', []))} agents, {len(local_tools.get('commands', []))} commands")
 
     if matched_tools:
-        print(f"\n✅ Local tools matched to your PLAN.md:")
-        print("-" * 60)
+        out.append(f"\n✅ Local tools matched to your PLAN.md:")
+        out.append("-" * 60)
 
         local_matches = [t for t in matched_tools if t.get('source') in ('project', 'local')]
 
-        for i, tool in enumerate(local_matches[:10], 1):
+        for i, tool in enumerate(local_matches[:_LOCAL_MATCH_DISPLAY_LIMIT], 1):
             source = tool.get('source', 'unknown')
             icon = '📁' if source == 'project' else '🏠'
-            print(f"\n  {i}. {icon} [{source.upper()}] {tool.get('name', 'unknown')}")
-            desc = tool.get('description', 'N/A')
-            if len(desc) > 70:
-                desc = desc[:67] + "..."
-            print(f"     {desc}")
+            out.append(f"\n  {i}. {icon} [{source.upper()}] {tool.get('name', 'unknown')}")
+            out.append(f"     {_truncate(tool.get('description', 'N/A'))}")
     else:
-        print("\n⚠️  No local tools matched to your PLAN.md content.")
-        print("💡 Consider searching the marketplace for relevant tools.")
-        sys.stdout.flush()
-
-    print("\n" + "=" * 60)
-    print("\nOptions:")
-    print("  [y] Search marketplace for more tools → See installable plugins")
-    print("  [n] Skip marketplace search → Use local tools only")
-    print("  [q] Quit without changes")
+        out.append("\n⚠️  No local tools matched to your PLAN.md content.")
+        out.append("💡 Consider searching the marketplace for relevant tools.")
+
+    out.append("\n" + "=" * 60)
+    out.append("\nOptions:")
+    out.append("  [y] Search marketplace for more tools → See installable plugins")
+    out.append("  [n] Skip marketplace search → Use local tools only")
+    out.append("  [q] Quit without changes")
+    sys.stdout.write('\n'.join(out) + '\n')
     sys.stdout.flush()
 
-    choice = input("\n👉 Search marketplace for additional tools? [y/n/q]: ").strip().lower()
+    try:
+        choice = input("\n👉 Search marketplace for additional tools? [y/n/q]: ").strip().lower()
+    except EOFError:
+        # No answer available (e.g. stdin closed in batch runs)
+        choice = 'n'
 
     if choice == 'y':
         return True
@@ -365,81 +642,85 @@ def print_local_matches(project_tools, local_tools, matched_tools):
 
 def print_final_report(matched_tools, searched_marketplace=False):
     """Print final report with all matched tools."""
-    print("\n" + "=" * 60)
-    print("🎯 Final Tool Discovery Results")
-    print("=" * 60)
+    # Collect lines and emit them with a single write
+    out = []
+    out.append("\n" + "=" * 60)
+    out.append("🎯 Final Tool Discovery Results")
+    out.append("=" * 60)
 
     if searched_marketplace:
-        print("\n🌐 Including marketplace-sourced plugins")
+        out.append("\n🌐 Including marketplace-sourced plugins")
     else:
-        print("\n📦 Using local tools only")
+        out.append("\n📦 Using local tools only")
 
     if not matched_tools:
-        print("\n⚠️  No matching tools found.")
+        out.append("\n⚠️  No matching tools found.")
+        sys.stdout.write('\n'.join(out) + '\n')
         return
 
-    # Separate tools by source
-    project_tools = [t for t in matched_tools if t.get('source') == 'project']
-    local_tools = [t for t in matched_tools if t.get('source') == 'local']
-    marketplace_tools = [t for t in matched_tools if t.get('source') == 'marketplace']
+    # Separate tools by source in one pass
+    project_tools, local_tools, marketplace_tools = [], [], []
+    by_source = {'project': project_tools, 'local': local_tools, 'marketplace': marketplace_tools}
+    for tool in matched_tools:
+        bucket = by_source.get(tool.get('source'))
+        if bucket is not None:
+            bucket.append(tool)
 
     # Section 1: Available Local Tools
     if project_tools or local_tools:
-        print(f"\n" + "=" * 60)
-        print("✅ Available Local Tools (Ready to Use)")
-        print("=" * 60)
+        out.append(f"\n" + "=" * 60)
+        out.append("✅ Available Local Tools (Ready to Use)")
+        out.append("=" * 60)
 
         for i, tool in enumerate(project_tools + local_tools, 1):
             source = tool.get('source', 'unknown')
             icon = '📁' if source == 'project' else '🏠'
-            print(f"\n  {i}. {icon} [{source.upper()}] {tool.get('name', 'unknown')}")
-            desc = tool.get('description', 'N/A')
-            if len(desc) > 70:
-                desc = desc[:67] + "..."
-            print(f"     {desc}")
+            out.append(f"\n  {i}. {icon} [{source.upper()}] {tool.get('name', 'unknown')}")
+            out.append(f"     {_truncate(tool.get('description', 'N/A'))}")
 
     # Section 2: Installable Marketplace Plugins
     if marketplace_tools:
-        print(f"\n" + "=" * 60)
-        print("🌐 Installable Marketplace Plugins")
-        print("=" * 60)
-        print("\n💡 Run these commands to install additional plugins:\n")
+        out.append(f"\n" + "=" * 60)
+        out.append("🌐 Installable Marketplace Plugins")
+        out.append("=" * 60)
+        out.append("\n💡 Run these commands to install additional plugins:\n")
 
         for i, tool in enumerate(marketplace_tools, 1):
-            print(f"  {i}. {tool.get('name', 'unknown')}")
-            desc = tool.get('description', 'N/A')
-            if len(desc) > 70:
-                desc = desc[:67] + "..."
-            print(f"     {desc}")
+            out.append(f"  {i}. {tool.get('name', 'unknown')}")
+            out.append(f"     {_truncate(tool.get('description', 'N/A'))}")
 
             # Show relevance score if available
             score = tool.get('relevance_score')
             if score is not None:
-                print(f"     Relevance: {score:.2f}")
+                out.append(f"     Relevance: {score:.2f}")
 
-            print(f"     Install: {tool.get('install_cmd')}")
+            out.append(f"     Install: {tool.get('install_cmd')}")
 
             # Show match reason if available
             reason = tool.get('match_reason')
             if reason:
-                print(f"     Reason: {reason[:100]}{'...' if len(reason) > 100 else ''}")
+                out.append(f"     Reason: {reason[:100]}{'...' if len(reason) > 100 else ''}")
 
     # Section 3: Summary
-    print(f"\n" + "=" * 60)
-    print("📊 Summary")
-    print("=" * 60)
-    print(f"  📁 Project-local tools: {len(project_tools)}")
-    print(f"  🏠 Global installed: {len(local_tools)}")
-    print(f"  🌐 Marketplace available: {len(marketplace_tools)}")
-    print(f"  📦 Total matched: {len(matched_tools)}")
+    out.append(f"\n" + "=" * 60)
+    out.append("📊 Summary")
+    out.append("=" * 60)
+    out.append(f"  📁 Project-local tools: {len(project_tools)}")
+    out.append(f"  🏠 Global installed: {len(local_tools)}")
+    out.append(f"  🌐 Marketplace available: {len(marketplace_tools)}")
+    out.append(f"  📦 Total matched: {len(matched_tools)}")
+
+    sys.stdout.write('\n'.join(out) + '\n')
 
 
 def main():
     # Check for --yes flag (skip marketplace search prompt)
     auto_yes = '--yes' in sys.argv
+    # Check for --no flag (skip marketplace search prompt, local tools only)
+    auto_no = '--no' in sys.argv and not auto_yes
     # Check for --verbose flag (show more details)
     verbose = '--verbose' in sys.argv
-    sys.argv = [a for a in sys.argv if a not in ['--yes', '--verbose']]
+    sys.argv = [a for a in sys.argv if a not in ['--yes', '--no', '--verbose']]
 
     if len(sys.argv) < 2:
         plan_path = Path.cwd() / 'PLAN.md'
@@ -450,12 +731,22 @@ def main():
         print(f"Error: PLAN.md not found at {plan_path}")
         sys.exit(1)
 
+    # Read the plan once; the marketplace search reuses the content
     plan_content = plan_path.read_text()
+    if not plan_content.strip():
+        # Nothing to match against, so skip the scans entirely
+        print(f"⚠️  PLAN.md at {plan_path} is empty; add tasks before discovering tools.")
+        return
     plan_keywords = extract_keywords_from_plan(plan_content)
 
     if verbose:
         print(f"📝 Extracted keywords: {plan_keywords}")
 
+    # --yes always searches the marketplace, so list its plugins in the
+    # background while the local scans run
+    prefetch_executor = ThreadPoolExecutor(max_workers=1) if auto_yes else None
+    plugins_future = prefetch_executor.submit(fetch_marketplace_plugins, verbose) if auto_yes else None
+
     print("📁 Scanning for project-local tools...")
     project_tools = scan_project_tools()
     if verbose:
@@ -466,26 +757,37 @@ def main():
     if verbose:
         print(f"   Found: {len(local_tools.get('skills', []))} skills, {len(local_tools.get('agents', []))} agents, {len(local_tools.get('commands', []))} commands")
 
-    # Merge local tools only for initial matching
-    local_matched = merge_and_score_tools(local_tools, [], project_tools, plan_keywords)
+    # Merge local tools only for initial matching; phase 1 only displays
+    # the best few local matches. The merge is kept for the final report.
+    local_merged = _merge_tools(project_tools, local_tools, [])
+    local_matched = _rank_tools(local_merged, top=_LOCAL_MATCH_DISPLAY_LIMIT)
     if verbose:
-        print(f"   Matched: {len(local_matched)} tools")
+        print(f"   Top matches: {len(local_matched)} tools")
         sys.stdout.flush()
 
     # Show local matches and ask about marketplace search
     if auto_yes:
         searched_marketplace = True
         print("\n🌐 Auto-searching marketplace (--yes flag)")
+    elif auto_no:
+        searched_marketplace = False
+        print("\n⏭️  Skipping marketplace search (--no flag). Using local tools only.")
     else:
         searched_marketplace = print_local_matches(project_tools, local_tools, local_matched)
 
     marketplace_tools = []
     if searched_marketplace:
         print("\n🌐 Searching marketplace for plugins...")
-        marketplace_tools = search_marketplace_for_plugins(plan_path, verbose=verbose)
+        marketplace_tools = search_marketplace_for_plugins(
+            plan_content,
+            verbose=verbose,
+            plugins=plugins_future.result() if plugins_future else None
+        )
+    if prefetch_executor:
+        prefetch_executor.shutdown()
 
-    # Final merge of all tools
-    matched_tools = merge_and_score_tools(local_tools, marketplace_tools, project_tools, plan_keywords)
+    # Final merge: only marketplace tools are new since phase 1
+    matched_tools = _rank_tools(_merge_tools({}, {}, marketplace_tools, local_merged))
 
     # Print phase 2 results
     print("\n" + "=" * 60)
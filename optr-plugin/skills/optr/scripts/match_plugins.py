@@ -10,6 +10,8 @@ Usage:
     python scripts/match-plugins.py --api-key YOUR_KEY [path/to/PLAN.md]
     python scripts/match-plugins.py --model claude-3-7-sonnet [path/to/PLAN.md]
     python scripts/match-plugins.py --verbose [path/to/PLAN.md]
+    python scripts/match-plugins.py --pretty [path/to/PLAN.md]
+    python scripts/match-plugins.py --refresh [path/to/PLAN.md]
 
 This script:
 1. Calls `claude plugin list --available --json` to get marketplace plugins
@@ -19,10 +21,14 @@ This script:
 """
 
 import argparse
+import heapq
 import json
+import math
 import os
+import re
 import subprocess
 import sys
+import time
 from pathlib import Path
 
 from typing import Any, Dict, List, Optional
@@ -31,14 +37,59 @@ from typing import Any, Dict, List, Optional
 # Force unbuffered output for better visibility in Claude CLI
 sys.stdout.reconfigure(line_buffering=True) if hasattr(sys.stdout, 'reconfigure') else None
 
+# Marketplace plugin list cached on disk between runs, and how long
+# (seconds) a cached copy is reused before asking the CLI again
+_PLUGINS_CACHE_PATH = Path.home() / '.cache' / 'optr' / 'plugins-list.json'
+_PLUGINS_CACHE_TTL = 300
 
-def get_available_plugins() -> List[Dict[str, Any]]:
+# Most plugins listed in the matching prompt; larger marketplaces are
+# narrowed by word overlap with the plan first
+_MAX_PROMPT_PLUGINS = 50
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+# Leading characters of PLAN.md included in the matching prompt
+_PLAN_PROMPT_CHARS = 3000
+
+
+def _load_cached_plugins() -> Optional[List[Dict[str, Any]]]:
+    """Return the cached plugin list if it is fresh, else None."""
+    try:
+        if time.time() - _PLUGINS_CACHE_PATH.stat().st_mtime > _PLUGINS_CACHE_TTL:
+            return None
+        with open(_PLUGINS_CACHE_PATH, 'r') as f:
+            plugins = json.load(f)
+        return plugins if isinstance(plugins, list) else None
+    except (OSError, ValueError):
+        return None
+
+
+def _save_cached_plugins(plugins: List[Dict[str, Any]]):
+    """Persist the plugin list atomically; failures are ignored."""
+    try:
+        _PLUGINS_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = _PLUGINS_CACHE_PATH.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(plugins, f)
+        os.replace(tmp_path, _PLUGINS_CACHE_PATH)
+    except OSError:
+        pass
+
+
+def get_available_plugins(refresh: bool = False) -> List[Dict[str, Any]]:
     """
     Get list of available marketplace plugins using claude CLI.
 
+    The list is cached for _PLUGINS_CACHE_TTL seconds; pass refresh=True
+    to bypass the cache.
+
     Returns:
         List of plugin dictionaries with name, description, repository info
     """
+    if not refresh:
+        cached = _load_cached_plugins()
+        if cached is not None:
+            return cached
+
     try:
         result = subprocess.run(
             ['claude', 'plugin', 'list', '--available', '--json'],
@@ -52,14 +103,61 @@ def get_available_plugins() -> List[Dict[str, Any]]:
 
         try:
             plugins = json.loads(result.stdout)
-            return plugins if isinstance(plugins, list) else []
         except json.JSONDecodeError:
             return []
+        if not isinstance(plugins, list):
+            return []
+        _save_cached_plugins(plugins)
+        return plugins
 
     except (subprocess.TimeoutExpired, FileNotFoundError):
         return []
 
 
+def _prefilter_plugins(
+    plan_content: str,
+    plugins: List[Dict[str, Any]],
+    limit: int = _MAX_PROMPT_PLUGINS
+) -> List[Dict[str, Any]]:
+    """
+    Keep the limit plugins whose name and description best overlap the plan.
+
+    Each plugin scores the number of words it shares with the plan,
+    damped by the log of its own word count so long descriptions do not
+    win by size alone. Lists within the limit are returned unchanged.
+    """
+    if len(plugins) <= limit:
+        return plugins
+
+    plan_words = set(_WORD_RE.findall(plan_content.lower()))
+
+    def overlap(plugin):
+        text = f"{plugin.get('name', '')} {plugin.get('description', plugin.get('summary', ''))}"
+        words = set(_WORD_RE.findall(text.lower()))
+        if not words:
+            return 0.0
+        return len(plan_words & words) / (1 + math.log(len(words)))
+
+    return heapq.nlargest(limit, plugins, key=overlap)
+
+
+def _parse_matches(response_text: str) -> Any:
+    """
+    Parse the model's JSON array response.
+
+    If the array is wrapped in prose or a code fence, the outermost
+    [...] span is parsed instead of failing the whole match.
+    """
+    try:
+        return json.loads(response_text)
+    except json.JSONDecodeError:
+        start = response_text.find('[')
+        end = response_text.rfind(']')
+        if start < 0 or end < start:
+            raise
+        return json.loads(response_text[start:end + 1])
+
+
 def match_plugins_with_claude(
     plan_content: str,
     plugins: List[Dict[str, Any]],
@@ -104,9 +202,12 @@ def match_plugins_with_claude(
     try:
         client = Anthropic(api_key=api_key)
 
+        # Narrow large marketplaces locally before paying for prompt tokens
+        candidates = _prefilter_plugins(plan_content, plugins)
+
         # Build plugin list for context
         plugin_descriptions = []
-        for i, plugin in enumerate(plugins):
+        for i, plugin in enumerate(candidates):
             name = plugin.get('name', 'unknown')
             desc = plugin.get('description', plugin.get('summary', ''))
             repo = plugin.get('repository', plugin.get('repo', ''))
@@ -124,7 +225,7 @@ def match_plugins_with_claude(
         prompt = f"""You are a plugin matching assistant. Given a project plan and a list of available Claude Code plugins, identify which plugins would be most useful for the plan.
 
 Project Plan:
-{plan_content[:3000]}
+{plan_content[:_PLAN_PROMPT_CHARS]}
 
 Available Plugins:
 {plugins_text}
@@ -142,7 +243,7 @@ Only include plugins with a score >= {threshold}. Score from 0 (not relevant) to
 Return ONLY the JSON array, no other text."""
 
         if verbose:
-            print(f"match-plugins.py: Calling Claude API with {len(plugins)} plugins", file=sys.stderr)
+            print(f"match-plugins.py: Calling Claude API with {len(candidates)} of {len(plugins)} plugins", file=sys.stderr)
 
         response = client.messages.create(
             model=model,
@@ -157,15 +258,18 @@ Return ONLY the JSON array, no other text."""
             print(f"match-plugins.py: Got response from Claude API", file=sys.stderr)
 
         # Parse JSON response
-        matches = json.loads(response_text)
+        matches = _parse_matches(response_text)
 
         # Enhance matches with full plugin info
         matched_plugins = []
         plugin_by_name = {p.get('name', ''): p for p in plugins}
+        # Keep only the first match per plugin if the model repeats one
+        seen_names = set()
 
         for match in matches if isinstance(matches, list) else []:
             name = match.get('name', '')
-            if name and name in plugin_by_name:
+            if name and name in plugin_by_name and name not in seen_names:
+                seen_names.add(name)
                 plugin_info = plugin_by_name[name].copy()
                 plugin_info['relevance_score'] = match.get('score', 0.5)
                 plugin_info['match_reason'] = match.get('reason', '')
@@ -223,6 +327,16 @@ def main():
         action='store_true',
         help='Print debug information to stderr'
     )
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Ignore the cached marketplace plugin list'
+    )
+    parser.add_argument(
+        '--pretty',
+        action='store_true',
+        help='Indent the JSON output (default: compact)'
+    )
 
     args = parser.parse_args()
 
@@ -242,13 +356,15 @@ def main():
         print(f"Error: PLAN.md not found at {plan_path}", file=sys.stderr)
         sys.exit(1)
 
-    plan_content = plan_path.read_text()
+    # Only the head of the plan goes into the prompt, so read no more
+    with plan_path.open() as f:
+        plan_content = f.read(_PLAN_PROMPT_CHARS)
 
     if args.verbose:
         print(f"match-plugins.py: Read plan from {plan_path} ({len(plan_content)} chars)", file=sys.stderr)
 
     # Get available plugins
-    plugins = get_available_plugins()
+    plugins = get_available_plugins(refresh=args.refresh)
 
     if args.verbose:
         print(f"match-plugins.py: Found {len(plugins)} available marketplace plugins", file=sys.stderr)
@@ -269,8 +385,12 @@ def main():
     if args.verbose:
         print(f"match-plugins.py: Returning {len(filtered)} matched plugins (threshold={args.threshold})", file=sys.stderr)
 
-    # Output JSON
-    print(json.dumps(filtered, indent=2))
+    # Stream JSON straight to stdout; indentation is opt-in
+    if args.pretty:
+        json.dump(filtered, sys.stdout, indent=2)
+    else:
+        json.dump(filtered, sys.stdout, separators=(',', ':'))
+    sys.stdout.write('\n')
 
 
 if __name__ == '__main__':
@@ -13,6 +13,18 @@ import sys
 import re
 from pathlib import Path
 
+# Report icon for each suggestion type
+_SUGGESTION_ICONS = {'vague': '⚠️', 'too-large': '📦', 'missing-criteria': '🎯'}
+
+# Words that mark a task description as vague
+_VAGUE_WORDS = frozenset({'fix', 'add', 'update', 'stuff', 'things', 'etc'})
+
+# Candidate task lines ("- ..." after optional indentation)
+_TASK_LINE_RE = re.compile(r'^[^\S\n]*- .*$', re.MULTILINE)
+
+# Substrings that indicate acceptance criteria near a task
+_CRITERIA_WORDS = ('acceptance', 'criteria', 'verify', 'test')
+
 
 def analyze_plan(plan_path):
     """Analyze PLAN.md and provide optimization suggestions."""
@@ -23,22 +35,24 @@ def analyze_plan(plan_path):
     tasks = []
     lines = content.split('\n')
 
-    # Extract tasks
-    for i, line in enumerate(lines):
-        stripped = line.strip()
-        if stripped.startswith('- ') or stripped.startswith('- [ ]'):
+    # Extract tasks; the regex skips non-task lines without a Python loop
+    line_no, pos = 1, 0
+    for match in _TASK_LINE_RE.finditer(content):
+        line_no += content.count('\n', pos, match.start())
+        pos = match.start()
+        stripped = match.group().strip()
+        if stripped.startswith('- '):
             task_text = stripped.replace('- [ ]', '').replace('- ', '').strip()
             if task_text:
                 tasks.append({
-                    'line': i + 1,
+                    'line': line_no,
                     'text': task_text
                 })
 
     # Check for vague task descriptions
-    vague_words = ['fix', 'add', 'update', 'stuff', 'things', 'etc']
     for task in tasks:
         words = task['text'].lower().split()
-        if any(word in vague_words for word in words):
+        if not _VAGUE_WORDS.isdisjoint(words):
             suggestions.append({
                 'line': task['line'],
                 'task': task['text'],
@@ -58,13 +72,21 @@ def analyze_plan(plan_path):
             })
 
     # Check for missing acceptance criteria
-    # Look for patterns like "Acceptance:" or "Criteria:" near tasks
-    for i, task in enumerate(tasks):
+    # Look for patterns like "Acceptance:" or "Criteria:" near tasks.
+    # Index the matching lines once so each task checks its window
+    # without rebuilding and lowercasing the surrounding text.
+    criteria_lines = set()
+    if tasks:
+        for i, line in enumerate(lines):
+            line_lower = line.lower()
+            if any(word in line_lower for word in _CRITERIA_WORDS):
+                criteria_lines.add(i)
+
+    for task in tasks:
         context_start = max(0, task['line'] - 3)
         context_end = min(len(lines), task['line'] + 3)
-        context = '\n'.join(lines[context_start:context_end]).lower()
 
-        if not any(word in context for word in ['acceptance', 'criteria', 'verify', 'test']):
+        if criteria_lines.isdisjoint(range(context_start, context_end)):
             suggestions.append({
                 'line': task['line'],
                 'task': task['text'],
@@ -80,21 +102,23 @@ def analyze_plan(plan_path):
 
 def print_report(analysis):
     """Print analysis report."""
-    print(f"\n=== PLAN.md Analysis ===")
-    print(f"Total tasks found: {analysis['total_tasks']}")
-    print(f"Optimization suggestions: {len(analysis['suggestions'])}\n")
+    # Collect lines and emit them with a single write
+    out = [
+        "\n=== PLAN.md Analysis ===",
+        f"Total tasks found: {analysis['total_tasks']}",
+        f"Optimization suggestions: {len(analysis['suggestions'])}\n",
+    ]
 
     if not analysis['suggestions']:
-        print("✓ No issues found! Your plan looks well-structured.")
-        return
-
-    for suggestion in analysis['suggestions']:
-        icon = {'vague': '⚠️', 'too-large': '📦', 'missing-criteria': '🎯'}.get(
-            suggestion['type'], '💡'
-        )
-        print(f"{icon} Line {suggestion['line']}: {suggestion['message']}")
-        print(f"   Task: \"{suggestion['task']}\"")
-        print()
+        out.append("✓ No issues found! Your plan looks well-structured.")
+    else:
+        for suggestion in analysis['suggestions']:
+            icon = _SUGGESTION_ICONS.get(suggestion['type'], '💡')
+            out.append(f"{icon} Line {suggestion['line']}: {suggestion['message']}")
+            out.append(f"   Task: \"{suggestion['task']}\"")
+            out.append("")
+
+    sys.stdout.write('\n'.join(out) + '\n')
 
 
 def main():
@@ -16,14 +16,47 @@ This script is automatically called by OPTR after team task completion.
 import sys
 import re
 import os
-import ast
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
-
-def update_plan_markdown(plan_path):
-    """Update PLAN.md with completed task markers and timestamp."""
+# Patterns are compiled once at import rather than looked up in the re
+# module cache on every call
+
+# Completed task not already marked with a check emoji
+_COMPLETED_TASK_RE = re.compile(r'- \[x\](.*?)(?!✅)')
+# "Last Updated" stamp line in PLAN.md
+_LAST_UPDATED_RE = re.compile(r'_Last Updated:.*')
+# Title line at the very start of PLAN.md
+_TITLE_RE = re.compile(r'(^(# .+)$)')
+# Script checks: TODOs, imports, and (in the same line-anchored pass as
+# imports) print() calls
+_TODO_RE = re.compile(r'(TODO|FIXME):?\s*(.+)')
+_IMPORT_RE = re.compile(r'^import\s+(\w+)|^from\s+(\w+)', re.MULTILINE)
+_IMPORT_OR_PRINT_RE = re.compile(r'^(?:import\s+(\w+)|from\s+(\w+)|\s*print\()', re.MULTILINE)
+
+# Directories never searched for project scripts: VCS metadata, caches,
+# virtualenvs, vendored dependencies and build output
+_SKIP_DIRS = frozenset({
+    '.git', '__pycache__', '.venv', 'venv', 'node_modules',
+    '.mypy_cache', '.ruff_cache', '.pytest_cache', '.tox',
+    'build', 'dist',
+})
+
+# Script check results keyed by file path and reused while the file's
+# mtime and size are unchanged
+_SCRIPT_CACHE_PATH = Path.home() / '.cache' / 'optr' / 'sync-docs-cache.json'
+_SCRIPT_CACHE_MAX_ENTRIES = 4096
+# Bump when the script checks change; caches from other versions are discarded whole
+_SCRIPT_CACHE_VERSION = 2
+
+# Upper bound on threads for reading scripts that miss the cache
+_READ_WORKERS = 8
+
+
+def update_plan_markdown(plan_path, now=None):
+    """Update PLAN.md with completed task markers and a timestamp from now."""
     if not plan_path.exists():
         print(f"  ⚠️  PLAN.md not found at {plan_path}")
         return False
@@ -31,21 +64,22 @@ def update_plan_markdown(plan_path):
     content = plan_path.read_text()
     original_content = content
 
-    # Ensure consistent formatting of completed tasks
-    content = re.sub(r'- \[x\](.*?)(?!✅)', r'- [x]\1 ✅', content)
+    # Ensure consistent formatting of completed tasks; the substring test
+    # skips the regex entirely for plans with none
+    if "- [x]" in content:
+        content = _COMPLETED_TASK_RE.sub(r'- [x]\1 ✅', content)
 
     # Add/update last updated timestamp
+    timestamp = (now or datetime.now()).strftime("%Y-%m-%d %H:%M")
     if "_Last Updated:" in content:
-        content = re.sub(
-            r'_Last Updated:.*',
-            f'_Last Updated: {datetime.now().strftime("%Y-%m-%d %H:%M")}_',
+        content = _LAST_UPDATED_RE.sub(
+            f'_Last Updated: {timestamp}_',
             content
         )
-    else:
-        # Add timestamp after the title
-        content = re.sub(
-            r'(^(# .+)$)',
-            r'\1\n\n_Last Updated: ' + datetime.now().strftime("%Y-%m-%d %H:%M") + '_',
+    elif content.startswith("# "):
+        # Add timestamp after the title (the pattern is anchored at the start)
+        content = _TITLE_RE.sub(
+            r'\1\n\n_Last Updated: ' + timestamp + '_',
             content,
             count=1
         )
@@ -59,8 +93,8 @@ def update_plan_markdown(plan_path):
         return False
 
 
-def update_readme(readme_path, changes_summary):
-    """Update README.md based on project changes."""
+def update_readme(readme_path, changes_summary, now=None):
+    """Update README.md based on project changes, dating entries from now."""
     if not readme_path.exists():
         print(f"  ⚠️  README.md not found at {readme_path}")
         return False
@@ -68,24 +102,19 @@ def update_readme(readme_path, changes_summary):
     content = readme_path.read_text()
     original_content = content
 
+    date = (now or datetime.now()).strftime('%Y-%m-%d')
+
     # Add changelog section if not exists
     if "## Changelog" not in content and changes_summary:
-        changelog_entry = f"\n## Changelog\n\n### {datetime.now().strftime('%Y-%m-%d')}\n\n"
-        for change in changes_summary:
-            changelog_entry += f"- {change}\n"
-        content += changelog_entry
+        # Join the entry lines once rather than concatenating in a loop
+        changes_list = ''.join(f"- {change}\n" for change in changes_summary)
+        content += f"\n## Changelog\n\n### {date}\n\n{changes_list}"
     elif "## Changelog" in content and changes_summary:
         # Add new entry to existing changelog
-        new_entry = f"\n### {datetime.now().strftime('%Y-%m-%d')}\n\n"
-        for change in changes_summary:
-            new_entry += f"- {change}\n"
-        # Insert after the Changelog heading
-        content = re.sub(
-            r'(## Changelog\n)',
-            r'\1' + new_entry,
-            content,
-            count=1
-        )
+        changes_list = ''.join(f"- {change}\n" for change in changes_summary)
+        new_entry = f"\n### {date}\n\n{changes_list}"
+        # Insert after the Changelog heading (a literal, so no regex)
+        content = content.replace("## Changelog\n", "## Changelog\n" + new_entry, 1)
 
     if content != original_content:
         readme_path.write_text(content)
@@ -96,7 +125,15 @@ def update_readme(readme_path, changes_summary):
         return False
 
 
-def update_claude_md(claude_md_path, project_dir):
+def _plugin_scripts(project_dir):
+    """Return the plugin's scripts/*.py paths, or None if that directory is missing."""
+    scripts_dir = project_dir / "optr-plugin" / "skills" / "optr" / "scripts"
+    if not scripts_dir.exists():
+        return None
+    return list(scripts_dir.glob("*.py"))
+
+
+def update_claude_md(claude_md_path, project_dir, scripts=None):
     """Update CLAUDE.md with current project structure and scripts."""
     if not claude_md_path.exists():
         print(f"  ⚠️  CLAUDE.md not found at {claude_md_path}")
@@ -106,9 +143,9 @@ def update_claude_md(claude_md_path, project_dir):
     original_content = content
 
     # Update utility scripts section if new scripts exist
-    scripts_dir = project_dir / "optr-plugin" / "skills" / "optr" / "scripts"
-    if scripts_dir.exists():
-        scripts = list(scripts_dir.glob("*.py"))
+    if scripts is None:
+        scripts = _plugin_scripts(project_dir)
+    if scripts is not None:
         script_names = [s.name for s in scripts]
 
         # Check if sync-docs.py should be documented
@@ -118,11 +155,7 @@ def update_claude_md(claude_md_path, project_dir):
                 sync_docs_entry = "\n### Documentation & Script Sync\n```bash\npython3 optr-plugin/skills/optr/scripts/sync-docs.py\n```\nAutomatically updates PLAN.md, README.md, CLAUDE.md, and checks all project scripts after task completion.\n"
 
                 # Insert after the utility scripts section header
-                content = re.sub(
-                    r'(## Utility Scripts\n)',
-                    r'\1' + sync_docs_entry,
-                    content
-                )
+                content = content.replace("## Utility Scripts\n", "## Utility Scripts\n" + sync_docs_entry)
 
     if content != original_content:
         claude_md_path.write_text(content)
@@ -133,67 +166,174 @@ def update_claude_md(claude_md_path, project_dir):
         return False
 
 
-def check_and_update_scripts(project_dir):
-    """Check all project scripts for consistency and update as needed."""
-    print("\n  📜 Checking scripts...")
+def _collect_project_files(root, found=None):
+    """
+    Collect project files by kind in a single os.scandir walk.
 
-    scripts_to_check = []
-    plugin_dir = project_dir / "optr-plugin"
+    Returns {'py': [...], 'json': [...], 'requirements': [...]} of Paths,
+    the last holding requirements*.txt files. Directories in _SKIP_DIRS
+    are not entered. Each directory's files come before its
+    subdirectories, the same order Path.rglob yields.
+    """
+    if found is None:
+        found = {'py': [], 'json': [], 'requirements': []}
+    subdirs = []
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                name = entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if name not in _SKIP_DIRS:
+                        subdirs.append(entry.path)
+                elif name.endswith(".py"):
+                    found['py'].append(Path(entry.path))
+                elif name.endswith(".json"):
+                    found['json'].append(Path(entry.path))
+                elif name.startswith("requirements") and name.endswith(".txt"):
+                    found['requirements'].append(Path(entry.path))
+    except OSError:
+        return found
+
+    for subdir in subdirs:
+        _collect_project_files(subdir, found)
+    return found
+
+
+def _load_script_cache():
+    """Load the on-disk script check cache, or an empty one if unavailable."""
+    try:
+        with open(_SCRIPT_CACHE_PATH, 'r') as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or data.get('version') != _SCRIPT_CACHE_VERSION:
+            return {}
+        cache = data.get('entries')
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_script_cache(cache):
+    """Persist the script check cache atomically, keeping the most recent entries."""
+    for key in list(cache)[:max(0, len(cache) - _SCRIPT_CACHE_MAX_ENTRIES)]:
+        del cache[key]
+    try:
+        _SCRIPT_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = _SCRIPT_CACHE_PATH.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': _SCRIPT_CACHE_VERSION, 'entries': cache}, f)
+        os.replace(tmp_path, _SCRIPT_CACHE_PATH)
+    except OSError:
+        pass
+
+
+def _read_script(script):
+    """
+    Return the text of a script file, decoded as UTF-8 in one step.
+
+    Undecodable bytes become surrogate escapes, so a rewrite through
+    _write_script round-trips them unchanged.
+    """
+    return script.read_bytes().decode('utf-8', 'surrogateescape')
+
+
+def _write_script(script, content):
+    """Write script text produced by _read_script back to disk."""
+    script.write_bytes(content.encode('utf-8', 'surrogateescape'))
+
+
+def check_and_update_scripts(project_dir, py_files=None, imported_modules=None):
+    """
+    Check all project scripts for consistency and update as needed.
+
+    If imported_modules is a set, the top-level modules each script
+    imports are added to it, so the dependency check need not reread them.
+
+    Scripts whose (mtime, size) match the script check cache reuse their
+    cached issues and imports without being read; the rest are read
+    concurrently on a thread pool.
+    """
+    print("\n  📜 Checking scripts...")
 
-    # Find all Python scripts in the project
-    for script in project_dir.rglob("*.py"):
-        # Skip __pycache__ and virtual environments
-        if "__pycache__" not in str(script) and ".venv" not in str(script):
-            scripts_to_check.append(script)
+    # Find all Python scripts in the project (shared with the other checks)
+    scripts_to_check = py_files if py_files is not None else _collect_project_files(project_dir)['py']
 
     updated_count = 0
     issues_found = []
+    cache = _load_script_cache()
 
+    jobs = []
     for script in scripts_to_check:
+        key = os.path.abspath(script)
+        stat = script.stat()
+        stamp = [stat.st_mtime_ns, stat.st_size]
+        # Pop and re-insert so recently seen files survive pruning
+        cached = cache.pop(key, None)
+        if cached and cached[:2] == stamp:
+            cache[key] = cached
+        else:
+            cached = None
+        jobs.append((script, key, stamp, cached))
+
+    # Reads are I/O-bound, so overlap them; the checks below still run
+    # in walk order
+    misses = [script for script, _, _, cached in jobs if cached is None]
+    contents = {}
+    if misses:
+        with ThreadPoolExecutor(max_workers=min(_READ_WORKERS, len(misses))) as executor:
+            contents = dict(zip(misses, executor.map(_read_script, misses)))
+
+    for script, key, stamp, cached in jobs:
         relative_path = script.relative_to(project_dir)
-        content = script.read_text()
+
+        if cached:
+            issues, imports = cached[2], cached[3]
+            if imported_modules is not None:
+                imported_modules.update(imports)
+            if issues:
+                issues_found.append(f"  ⚠️  {relative_path}: {', '.join(issues)}")
+            continue
+
+        content = contents[script]
         original_content = content
         issues = []
 
-        # 1. Check shebang
+        # 1. Check shebang (it can only sit at offset 0)
         if script.name.endswith(".py"):
-            first_line = content.split('\n')[0] if content else ""
-            if not first_line.startswith("#!"):
+            if not content.startswith("#!"):
                 issues.append("missing shebang")
                 # Add shebang for executable scripts
                 if "scripts" in str(script):
                     content = f"#!/usr/bin/env python3\n\n{content}"
 
-        # 2. Check for hardcoded paths that might need updating
-        # Look for paths to scripts that might have moved
-        # Note: Comments mentioning script names are okay - only flag if clearly broken
-        script_refs = re.findall(r'(?:scripts|optr-plugin/skills/optr/scripts)/[\w\-\.]+\.py', content)
-        for ref in script_refs:
-            ref_path = project_dir / ref
-            # Only flag as broken if it's clearly a runtime path, not a comment
-            if "Usage:" in content or "python" in content.lower():
-                # These are likely documentation comments, skip
-                continue
-
-        # 3. Check for version numbers that might need syncing
-        version_matches = re.findall(r'version\s*=\s*["\']([\d.]+)["\']', content)
-        if version_matches:
-            # Could sync versions across scripts here
-            pass
-
-        # 4. Check for TODO/FIXME comments
-        todos = re.findall(r'(TODO|FIXME):?\s*(.+)', content)
+        # 2. Check for TODO/FIXME comments
+        todos = _TODO_RE.findall(content)
         if todos:
             issues.append(f"{len(todos)} TODO/FIXME comments")
 
-        # 5. Check for print statements (should use logging in production)
-        if "import logging" not in content and re.search(r'^\s*print\(', content, re.MULTILINE):
+        # Imports (recorded for check_script_dependencies) and print()
+        # calls are both line-anchored, so one scan finds both
+        imports = set()
+        uses_print = False
+        for match in _IMPORT_OR_PRINT_RE.finditer(content):
+            module = match.group(1) or match.group(2)
+            if module:
+                imports.add(module)
+            else:
+                uses_print = True
+        imports = sorted(imports)
+        if imported_modules is not None:
+            imported_modules.update(imports)
+
+        # 3. Check for print statements (should use logging in production)
+        if uses_print and "import logging" not in content:
             # Only warn for scripts not in examples/
             if "examples" not in str(script):
                 issues.append("uses print() instead of logging")
 
-        # 6. Check docstring
+        # 4. Check docstring
         if content.strip():
+            # Imported here: runs where every script is a cache hit never need it
+            import ast
             try:
                 module_ast = ast.parse(content)
                 docstring = ast.get_docstring(module_ast)
@@ -206,11 +346,15 @@ def check_and_update_scripts(project_dir):
         if issues:
             issues_found.append(f"  ⚠️  {relative_path}: {', '.join(issues)}")
 
-        # Update if content changed
+        # Update if content changed; rewritten scripts are rechecked next run
         if content != original_content:
-            script.write_text(content)
+            _write_script(script, content)
             updated_count += 1
             print(f"  ✅ Updated {relative_path}")
+        else:
+            cache[key] = stamp + [issues, imports]
+
+    _save_script_cache(cache)
 
     # Print summary
     if issues_found:
@@ -228,15 +372,15 @@ def check_and_update_scripts(project_dir):
     return updated_count > 0
 
 
-def sync_script_references(project_dir):
+def sync_script_references(project_dir, scripts=None):
     """Sync script references across documentation and other scripts."""
     print("\n  🔗 Syncing script references...")
 
-    scripts_dir = project_dir / "optr-plugin" / "skills" / "optr" / "scripts"
-    if not scripts_dir.exists():
+    if scripts is None:
+        scripts = _plugin_scripts(project_dir)
+    if scripts is None:
         return False
 
-    scripts = list(scripts_dir.glob("*.py"))
     script_names = [s.stem for s in scripts]
 
     # Files that might reference scripts
@@ -278,11 +422,18 @@ def sync_script_references(project_dir):
     return updated
 
 
-def check_script_dependencies(project_dir):
-    """Check that script dependencies are consistent."""
+def check_script_dependencies(project_dir, project_files=None, imported_modules=None):
+    """
+    Check that script dependencies are consistent.
+
+    Pass the imported_modules set filled by check_and_update_scripts to
+    skip reading the scripts again.
+    """
     print("\n  📦 Checking script dependencies...")
 
-    requirements_files = list(project_dir.rglob("requirements*.txt"))
+    if project_files is None:
+        project_files = _collect_project_files(project_dir)
+    requirements_files = project_files['requirements']
     has_issues = False
 
     # Common dependencies that should be documented
@@ -293,19 +444,18 @@ def check_script_dependencies(project_dir):
         "pytest": "Testing framework",
     }
 
-    # Find imports in scripts
-    imported_modules = set()
-    for script in project_dir.rglob("*.py"):
-        if "__pycache__" in str(script):
-            continue
-        try:
-            content = script.read_text()
-            imports = re.findall(r'^import\s+(\w+)|^from\s+(\w+)', content, re.MULTILINE)
-            for imp in imports:
-                module = imp[0] or imp[1]
-                imported_modules.add(module)
-        except:
-            continue
+    # Find imports in scripts, unless already collected
+    if imported_modules is None:
+        imported_modules = set()
+        for script in project_files['py']:
+            try:
+                content = script.read_text()
+                imports = _IMPORT_RE.findall(content)
+                for imp in imports:
+                    module = imp[0] or imp[1]
+                    imported_modules.add(module)
+            except:
+                continue
 
     # Check if requirements.txt exists for external dependencies
     if requirements_files:
@@ -323,7 +473,7 @@ def check_script_dependencies(project_dir):
 
 
 def update_plugin_version(plugin_json_path):
-    """Bump plugin version after changes."""
+    """Bump plugin version after changes (main only calls this when something changed)."""
     if not plugin_json_path.exists():
         return False
 
@@ -339,7 +489,11 @@ def update_plugin_version(plugin_json_path):
             new_version = f"{parts[0]}.{parts[1]}.{patch}"
             plugin_data["version"] = new_version
 
-            plugin_json_path.write_text(json.dumps(plugin_data, indent=2))
+            # Write a sibling file and swap it in so a failure never truncates the manifest
+            tmp_path = plugin_json_path.with_suffix('.tmp')
+            with tmp_path.open('w') as f:
+                json.dump(plugin_data, f, indent=2)
+            os.replace(tmp_path, plugin_json_path)
             print(f"  ✅ Bumped plugin version: {version} → {new_version}")
             return True
     except Exception as e:
@@ -348,19 +502,19 @@ def update_plugin_version(plugin_json_path):
     return False
 
 
-def generate_sync_report(project_dir):
+def generate_sync_report(project_dir, project_files=None):
     """Generate a report of what was synced."""
     print("\n📊 Sync Summary:")
     print("=" * 50)
 
-    # Count files by type
-    docs = list(project_dir.glob("*.md"))
-    scripts = list(project_dir.rglob("*.py"))
-    config_files = list(project_dir.rglob("*.json"))
+    # Count files by type, reusing the project walk
+    if project_files is None:
+        project_files = _collect_project_files(project_dir)
+    doc_count = sum(1 for _ in project_dir.glob("*.md"))
 
-    print(f"  📄 Documentation files: {len(docs)}")
-    print(f"  🐍 Python scripts: {len(scripts)}")
-    print(f"  ⚙️  Config files: {len(config_files)}")
+    print(f"  📄 Documentation files: {doc_count}")
+    print(f"  🐍 Python scripts: {len(project_files['py'])}")
+    print(f"  ⚙️  Config files: {len(project_files['json'])}")
 
     print("\n" + "=" * 50)
 
@@ -376,6 +530,9 @@ def main():
 
     changes = []
 
+    # One clock reading for every timestamp written in this run
+    now = datetime.now()
+
     # Track if any updates were made
     any_updates = False
 
@@ -385,29 +542,37 @@ def main():
     readme_path = project_dir / "README.md"
     claude_md_path = project_dir / "CLAUDE.md"
     plugin_json_path = project_dir / "optr-plugin" / ".claude-plugin" / "plugin.json"
+    # List the plugin scripts once for CLAUDE.md and the reference sync
+    plugin_scripts = _plugin_scripts(project_dir)
 
-    if update_plan_markdown(plan_path):
-        any_updates = True
-    if update_readme(readme_path, changes):
+    if update_plan_markdown(plan_path, now):
         any_updates = True
-    if update_claude_md(claude_md_path, project_dir):
+    if update_readme(readme_path, changes, now):
         any_updates = True
-    if update_plugin_version(plugin_json_path):
+    if update_claude_md(claude_md_path, project_dir, plugin_scripts):
         any_updates = True
 
+    # Walk the project once; the script checks and report share the result
+    project_files = _collect_project_files(project_dir)
+    imported_modules = set()
+
     # Check and update scripts
-    if check_and_update_scripts(project_dir):
+    if check_and_update_scripts(project_dir, project_files['py'], imported_modules):
         any_updates = True
 
     # Sync script references
-    if sync_script_references(project_dir):
+    if sync_script_references(project_dir, plugin_scripts):
         any_updates = True
 
+    # Bump the plugin version only if this run changed something
+    if any_updates:
+        update_plugin_version(plugin_json_path)
+
     # Check dependencies
-    check_script_dependencies(project_dir)
+    check_script_dependencies(project_dir, project_files, imported_modules)
 
     # Generate summary
-    generate_sync_report(project_dir)
+    generate_sync_report(project_dir, project_files)
 
     if any_updates:
         print("\n✨ Project sync complete!\n")
@@ -8,70 +8,153 @@ This script manages git worktrees for complex plan execution:
 - Cleans up worktrees when tasks complete
 """
 
-import argparse
+import copy
 import json
 import os
+import re
+import shutil
 import subprocess
 import sys
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional
 
+# Task lines ("- [ ]", "- [x]") with optional indentation
+_TASK_RE = re.compile(r'^[^\S\n]*- \[', re.MULTILINE)
+# Module and parallel-work keywords, found in one case-insensitive scan
+_MODULE_KEYWORDS = ('module', 'component', 'service', 'frontend', 'backend')
+_PARALLEL_KEYWORDS = ('parallel', 'concurrent', 'simultaneous')
+_KEYWORD_RE = re.compile('|'.join(_MODULE_KEYWORDS + _PARALLEL_KEYWORDS), re.IGNORECASE)
+# `git worktree list --porcelain` line keys mapped to worktree dict fields
+_PORCELAIN_FIELDS = {'worktree': 'path', 'branch': 'branch', 'HEAD': 'head'}
+# Upper bound on concurrent `git worktree remove` calls in cleanup_all
+_REMOVE_WORKERS = 8
+
+
+@lru_cache(maxsize=8)
+def _read_state_cached(path: str, mtime_ns: int, size: int) -> Dict:
+    """Parse a state file; mtime and size in the key drop stale entries."""
+    with open(path, 'r') as f:
+        return json.load(f)
+
 
 class WorktreeManager:
     """Manages git worktrees for OPTR task execution."""
 
-    def __init__(self, repo_root: Optional[Path] = None, state_file: str = ".optr-worktrees.json"):
+    def __init__(self, repo_root: Optional[Path] = None, state_file: str = ".optr-worktrees.json",
+                 pretty_state: bool = False):
         self.repo_root = Path(repo_root) if repo_root else Path.cwd()
         self.state_file = self.repo_root / state_file
+        # Indent the state file for humans; compact by default since it is machine-managed
+        self.pretty_state = pretty_state
+        # argv prefix shared by every git call; -C replaces a per-call cwd.
+        # An absolute git path plus no cwd/close_fds lets CPython use posix_spawn.
+        self._git_prefix = (shutil.which("git") or "git", "-C", os.fspath(self.repo_root))
         self.state = self._load_state()
+        # Sub-dicts of self.state, bound once for the hot paths below
+        self._worktrees = self.state.setdefault("worktrees", {})
+        self._assignments = self.state.setdefault("task_assignments", {})
+        # Nesting depth of batch() blocks; saves are deferred while > 0
+        self._batch_depth = 0
+        self._dirty = False
+        # file path -> ids of assigned tasks touching it
+        self._file_index: Dict[str, set] = {}
+        for task_id in self._assignments:
+            self._index_task_files(task_id)
+        # Parsed `git worktree list` output, reset when worktrees change
+        self._worktree_list: Optional[List[Dict]] = None
 
     def _load_state(self) -> Dict:
         """Load worktree state from file."""
-        if self.state_file.exists():
-            with open(self.state_file, 'r') as f:
-                return json.load(f)
-        return {"worktrees": {}, "task_assignments": {}}
+        try:
+            st = self.state_file.stat()
+        except FileNotFoundError:
+            return {"worktrees": {}, "task_assignments": {}}
+        # Copy so callers mutating self.state never touch the cached parse
+        return copy.deepcopy(_read_state_cached(str(self.state_file), st.st_mtime_ns, st.st_size))
 
     def _save_state(self):
-        """Save worktree state to file."""
-        with open(self.state_file, 'w') as f:
-            json.dump(self.state, f, indent=2)
+        """Save worktree state to file atomically, or defer it inside batch()."""
+        if self._batch_depth:
+            self._dirty = True
+            return
+        self._dirty = False
+        tmp_path = self.state_file.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            if self.pretty_state:
+                json.dump(self.state, f, indent=2)
+            else:
+                json.dump(self.state, f, separators=(',', ':'))
+        os.replace(tmp_path, self.state_file)
+        _read_state_cached.cache_clear()
+
+    @contextmanager
+    def batch(self):
+        """Collapse every state save made inside the block into one write."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._dirty:
+                self._save_state()
+
+    def _index_task_files(self, task_id: str, remove: bool = False):
+        """Add (or remove) an assigned task's files in the conflict index."""
+        assignment = self._assignments.get(task_id, {})
+        for path in assignment.get("files", []):
+            owners = self._file_index.setdefault(path, set())
+            if remove:
+                owners.discard(task_id)
+                if not owners:
+                    del self._file_index[path]
+            else:
+                owners.add(task_id)
 
     def _run_git(self, *args) -> subprocess.CompletedProcess:
-        """Run git command in repo root."""
-        return subprocess.run(
-            ["git"] + list(args),
-            cwd=self.repo_root,
-            capture_output=True,
+        """Run git command in repo root; output is left as bytes."""
+        return subprocess.run(self._git_prefix + args, capture_output=True, close_fds=False)
+
+    def _popen_git(self, *args) -> subprocess.Popen:
+        """Start git command in repo root with stdout streamed as text."""
+        return subprocess.Popen(
+            self._git_prefix + args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            close_fds=False,
             text=True
         )
 
     def list_worktrees(self) -> List[Dict]:
-        """List all git worktrees."""
-        result = self._run_git("worktree", "list", "--porcelain")
-        if result.returncode != 0:
-            return []
+        """List all git worktrees, reusing the last listing until one changes."""
+        if self._worktree_list is not None:
+            return list(self._worktree_list)
 
         worktrees = []
         current = {}
-        for line in result.stdout.strip().split('\n'):
-            if not line:
-                if current:
-                    worktrees.append(current)
-                    current = {}
-                continue
-
-            if line.startswith('worktree '):
-                current['path'] = line[9:]
-            elif line.startswith('branch '):
-                current['branch'] = line[7:]
-            elif line.startswith('HEAD '):
-                current['head'] = line[5:]
+        with self._popen_git("worktree", "list", "--porcelain") as proc:
+            # Parse lines as git writes them instead of splitting the whole output
+            for line in proc.stdout:
+                line = line.rstrip('\n')
+                if not line:
+                    if current:
+                        worktrees.append(current)
+                        current = {}
+                    continue
+
+                key, _, value = line.partition(' ')
+                field = _PORCELAIN_FIELDS.get(key)
+                if field:
+                    current[field] = value
+        if proc.returncode != 0:
+            return []
 
         if current:
             worktrees.append(current)
 
-        return worktrees
+        self._worktree_list = worktrees
+        return list(worktrees)
 
     def should_use_worktree(self, task: Dict) -> bool:
         """
@@ -92,16 +175,12 @@ class WorktreeManager:
 
         # Check for file conflicts with other assigned tasks
         task_id = task.get("id", "")
-        task_files = set(task.get("files", []))
-
-        for other_id, other_task in self.state.get("task_assignments", {}).items():
-            if other_id == task_id:
-                continue
-            other_files = set(other_task.get("files", []))
-            if task_files & other_files:  # Intersection exists
-                return True
-
-        return False
+        file_index = self._file_index
+        return any(
+            other_id != task_id
+            for path in task.get("files", [])
+            for other_id in file_index.get(path, ())
+        )
 
     def create_worktree(self, task_id: str, task_name: str, base_branch: str = "main") -> Optional[Dict]:
         """
@@ -112,31 +191,39 @@ class WorktreeManager:
         # Generate branch name
         branch_name = f"optr/task-{task_id}"
 
+        # Create worktree directory
+        worktree_name = f".optr-worktree-{task_id}"
+        worktree_path = self.repo_root / worktree_name
+
         # Check if branch already exists
-        result = self._run_git("branch", "--list", branch_name)
-        if result.stdout.strip():
+        branch_exists = self._run_git(
+            "show-ref", "--verify", "--quiet", f"refs/heads/{branch_name}"
+        ).returncode == 0
+
+        if branch_exists:
             # Branch exists, use it
-            pass
+            result = self._run_git(
+                "worktree", "add",
+                str(worktree_path),
+                branch_name
+            )
         else:
-            # Create new branch from base
-            result = self._run_git("branch", branch_name, base_branch)
+            # Create the branch from base and check it out in one git call
+            result = self._run_git(
+                "worktree", "add",
+                "-b", branch_name,
+                str(worktree_path),
+                base_branch
+            )
             if result.returncode != 0:
-                print(f"Failed to create branch: {result.stderr}")
+                print(f"Failed to create branch from '{base_branch}' and worktree: "
+                      f"{result.stderr.decode('utf-8', 'replace')}")
                 return None
 
-        # Create worktree directory
-        worktree_name = f".optr-worktree-{task_id}"
-        worktree_path = self.repo_root / worktree_name
-
-        result = self._run_git(
-            "worktree", "add",
-            str(worktree_path),
-            branch_name
-        )
-
         if result.returncode != 0:
-            print(f"Failed to create worktree: {result.stderr}")
+            print(f"Failed to create worktree: {result.stderr.decode('utf-8', 'replace')}")
             return None
+        self._worktree_list = None
 
         worktree_info = {
             "task_id": task_id,
@@ -147,8 +234,9 @@ class WorktreeManager:
         }
 
         # Update state
-        self.state["worktrees"][task_id] = worktree_info
-        self.state["task_assignments"][task_id] = {
+        self._worktrees[task_id] = worktree_info
+        self._index_task_files(task_id, remove=True)
+        self._assignments[task_id] = {
             "task_name": task_name,
             "worktree": worktree_name,
             "branch": branch_name
@@ -159,7 +247,7 @@ class WorktreeManager:
 
     def get_worktree_for_task(self, task_id: str) -> Optional[Dict]:
         """Get worktree info for a task."""
-        return self.state["worktrees"].get(task_id)
+        return self._worktrees.get(task_id)
 
     def remove_worktree(self, task_id: str, force: bool = False) -> bool:
         """
@@ -167,14 +255,20 @@ class WorktreeManager:
 
         Returns True if successful, False otherwise.
         """
-        worktree_info = self.state["worktrees"].get(task_id)
+        worktree_info = self._worktrees.get(task_id)
         if not worktree_info:
             print(f"No worktree found for task {task_id}")
             return False
 
-        worktree_path = worktree_info.get("path")
+        if not self._git_remove_worktree(worktree_info.get("path"), force):
+            return False
 
-        # Remove worktree
+        self._forget_worktree(task_id)
+
+        return True
+
+    def _git_remove_worktree(self, worktree_path: str, force: bool) -> bool:
+        """Run `git worktree remove`; touches no state, so safe in worker threads."""
         args = ["worktree", "remove"]
         if force:
             args.append("--force")
@@ -183,88 +277,189 @@ class WorktreeManager:
         result = self._run_git(*args)
 
         if result.returncode != 0:
-            print(f"Failed to remove worktree: {result.stderr}")
+            print(f"Failed to remove worktree: {result.stderr.decode('utf-8', 'replace')}")
             return False
+        return True
 
-        # Update state
-        del self.state["worktrees"][task_id]
-        if task_id in self.state["task_assignments"]:
-            del self.state["task_assignments"][task_id]
+    def _forget_worktree(self, task_id: str):
+        """Drop a removed worktree from state and save it."""
+        self._worktree_list = None
+        del self._worktrees[task_id]
+        if task_id in self._assignments:
+            self._index_task_files(task_id, remove=True)
+            del self._assignments[task_id]
         self._save_state()
 
-        return True
-
     def cleanup_all(self, force: bool = False) -> int:
         """
         Clean up all OPTR-managed worktrees.
 
         Returns number of worktrees removed.
         """
-        removed = 0
-        task_ids = list(self.state["worktrees"].keys())
+        task_ids = list(self._worktrees.keys())
+        if not task_ids:
+            return 0
+
+        # Imported here: only cleanup needs a thread pool
+        from concurrent.futures import ThreadPoolExecutor
 
-        for task_id in task_ids:
-            if self.remove_worktree(task_id, force=force):
-                removed += 1
+        # Removals hit separate worktree directories, so overlap the git calls
+        worktrees = self._worktrees
+        paths = [worktrees[task_id].get("path") for task_id in task_ids]
+        with ThreadPoolExecutor(max_workers=min(_REMOVE_WORKERS, len(paths))) as executor:
+            results = list(executor.map(lambda path: self._git_remove_worktree(path, force), paths))
+
+        removed = 0
+        with self.batch():
+            for task_id, ok in zip(task_ids, results):
+                if ok:
+                    self._forget_worktree(task_id)
+                    removed += 1
 
         return removed
 
-    def analyze_plan_complexity(self, plan_content: str) -> Dict:
+    def analyze_plan_complexity(self, plan_content: str) -> Dict[str, object]:
         """
         Analyze PLAN.md to determine if worktree support is needed.
 
         Returns dict with analysis results.
         """
-        lines = plan_content.split('\n')
+        return analyze_plan(plan_content)
 
-        # Count tasks (lines starting with - [ ])
-        task_count = sum(1 for line in lines if line.strip().startswith('- ['))
 
-        # Check for phase/module indicators
-        has_modules = any(
-            keyword in plan_content.lower()
-            for keyword in ['module', 'component', 'service', 'frontend', 'backend']
-        )
+def analyze_plan(plan_content: str) -> Dict[str, object]:
+    """
+    Analyze PLAN.md text for worktree needs.
 
-        # Check for complexity indicators
-        has_parallel_work = any(
-            keyword in plan_content.lower()
-            for keyword in ['parallel', 'concurrent', 'simultaneous']
-        )
+    Kept outside WorktreeManager so it runs without loading any state.
+    """
+    # Count tasks (lines starting with - [ ])
+    task_count = sum(1 for _ in _TASK_RE.finditer(plan_content))
 
-        # Recommend worktree if:
-        # - 8+ tasks
-        # - OR 5+ tasks with modules
-        # - OR explicit parallel work
-        recommend_worktree = (
-            task_count >= 8 or
-            (task_count >= 5 and has_modules) or
-            has_parallel_work
-        )
+    # Check for phase/module and complexity indicators in one pass
+    has_modules = has_parallel_work = False
+    for match in _KEYWORD_RE.finditer(plan_content):
+        if match.group().lower() in _PARALLEL_KEYWORDS:
+            has_parallel_work = True
+        else:
+            has_modules = True
+        if has_modules and has_parallel_work:
+            break
+
+    # Recommend worktree if:
+    # - 8+ tasks
+    # - OR 5+ tasks with modules
+    # - OR explicit parallel work
+    recommend_worktree = (
+        task_count >= 8 or
+        (task_count >= 5 and has_modules) or
+        has_parallel_work
+    )
+
+    return {
+        "task_count": task_count,
+        "has_modules": has_modules,
+        "has_parallel_work": has_parallel_work,
+        "recommend_worktree": recommend_worktree,
+        "reason": _recommendation_reason(task_count, has_modules, has_parallel_work)
+    }
+
+
+def _recommendation_reason(task_count: int, has_modules: bool, has_parallel: bool) -> str:
+    """Get human-readable reason for recommendation."""
+    if has_parallel:
+        return "Plan contains parallel/concurrent work indicators"
+    if task_count >= 8:
+        return f"High task count ({task_count} tasks)"
+    if task_count >= 5 and has_modules:
+        return f"Moderate task count ({task_count}) with multiple modules"
+    return "Single worktree is sufficient"
+
+
+def _cmd_list(manager: WorktreeManager) -> int:
+    """Print all worktrees, marking the main one."""
+    worktrees = manager.list_worktrees()
+    print(f"Found {len(worktrees)} worktrees:")
+    for wt in worktrees:
+        is_main = wt['path'] == str(manager.repo_root)
+        marker = " (main)" if is_main else ""
+        print(f"  - {wt['path']}{marker} [{wt.get('branch', 'detached')}]")
+    return 0
 
-        return {
-            "task_count": task_count,
-            "has_modules": has_modules,
-            "has_parallel_work": has_parallel_work,
-            "recommend_worktree": recommend_worktree,
-            "reason": self._get_recommendation_reason(task_count, has_modules, has_parallel_work)
-        }
 
-    def _get_recommendation_reason(self, task_count: int, has_modules: bool, has_parallel: bool) -> str:
-        """Get human-readable reason for recommendation."""
-        if has_parallel:
-            return "Plan contains parallel/concurrent work indicators"
-        if task_count >= 8:
-            return f"High task count ({task_count} tasks)"
-        if task_count >= 5 and has_modules:
-            return f"Moderate task count ({task_count}) with multiple modules"
-        return "Single worktree is sufficient"
+def _cmd_analyze(plan_file: str) -> int:
+    """Print the worktree analysis for a plan; returns 1 when worktrees are recommended."""
+    try:
+        with open(plan_file, 'r') as f:
+            plan_content = f.read()
+    except FileNotFoundError:
+        print(f"Error: Plan file not found: {plan_file}")
+        return 1
+
+    result = analyze_plan(plan_content)
+
+    print("\n" + "=" * 60)
+    print("Worktree Analysis for PLAN.md")
+    print("=" * 60)
+    print(f"Task count: {result['task_count']}")
+    print(f"Has modules: {result['has_modules']}")
+    print(f"Has parallel work: {result['has_parallel_work']}")
+    print()
+    if result['recommend_worktree']:
+        print("Recommendation: ENABLE worktree support")
+        print(f"Reason: {result['reason']}")
+    else:
+        print("Recommendation: Single worktree is sufficient")
+    print("=" * 60 + "\n")
+
+    # Exit code: 0 if no worktree needed, 1 if worktree recommended
+    return 0 if not result['recommend_worktree'] else 1
+
+
+def _cmd_should_use(manager: WorktreeManager, task_json: Optional[str]) -> int:
+    """Print "true" or "false" for a task given as JSON."""
+    if task_json:
+        task = json.loads(task_json)
+        if manager.should_use_worktree(task):
+            print("true")
+        else:
+            print("false")
+    return 0
+
+
+def _fast_dispatch(argv: List[str]) -> Optional[int]:
+    """
+    Run the `list` and `should-use` commands the OPTR driver calls per task
+    without importing argparse; returns None when argparse must handle argv.
+    """
+    command, rest = argv[0], argv[1:]
+    if command == "list" and not rest:
+        return _cmd_list(WorktreeManager())
+    if command == "should-use":
+        if not rest:
+            task_json = None
+        elif len(rest) == 2 and rest[0] == "--json":
+            task_json = rest[1]
+        elif len(rest) == 1 and rest[0].startswith("--json="):
+            task_json = rest[0][len("--json="):]
+        else:
+            return None
+        return _cmd_should_use(WorktreeManager(), task_json)
+    return None
 
 
 def main():
+    if len(sys.argv) > 1:
+        status = _fast_dispatch(sys.argv[1:])
+        if status is not None:
+            return status
+
+    import argparse
+
     parser = argparse.ArgumentParser(description="OPTR Worktree Manager")
     parser.add_argument("--repo", type=str, help="Repository root path")
     parser.add_argument("--state", type=str, default=".optr-worktrees.json", help="State file path")
+    parser.add_argument("--pretty", action="store_true", help="Write the state file indented for reading")
 
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
@@ -300,42 +495,14 @@ def main():
         parser.print_help()
         return 1
 
-    manager = WorktreeManager(repo_root=args.repo, state_file=args.state)
-
-    if args.command == "list":
-        worktrees = manager.list_worktrees()
-        print(f"Found {len(worktrees)} worktrees:")
-        for wt in worktrees:
-            is_main = wt['path'] == str(manager.repo_root)
-            marker = " (main)" if is_main else ""
-            print(f"  - {wt['path']}{marker} [{wt.get('branch', 'detached')}]")
-
-    elif args.command == "analyze":
-        if not os.path.exists(args.plan_file):
-            print(f"Error: Plan file not found: {args.plan_file}")
-            return 1
+    # analyze needs no state, so it runs before the manager is built
+    if args.command == "analyze":
+        return _cmd_analyze(args.plan_file)
 
-        with open(args.plan_file, 'r') as f:
-            plan_content = f.read()
+    manager = WorktreeManager(repo_root=args.repo, state_file=args.state, pretty_state=args.pretty)
 
-        result = manager.analyze_plan_complexity(plan_content)
-
-        print("\n" + "=" * 60)
-        print("Worktree Analysis for PLAN.md")
-        print("=" * 60)
-        print(f"Task count: {result['task_count']}")
-        print(f"Has modules: {result['has_modules']}")
-        print(f"Has parallel work: {result['has_parallel_work']}")
-        print()
-        if result['recommend_worktree']:
-            print("Recommendation: ENABLE worktree support")
-            print(f"Reason: {result['reason']}")
-        else:
-            print("Recommendation: Single worktree is sufficient")
-        print("=" * 60 + "\n")
-
-        # Exit code: 0 if no worktree needed, 1 if worktree recommended
-        return 0 if not result['recommend_worktree'] else 1
+    if args.command == "list":
+        return _cmd_list(manager)
 
     elif args.command == "create":
         result = manager.create_worktree(args.task_id, args.task_name, args.branch)
@@ -361,12 +528,7 @@ def main():
         print(f"Cleaned up {count} worktree(s)")
 
     elif args.command == "should-use":
-        if args.json:
-            task = json.loads(args.json)
-            if manager.should_use_worktree(task):
-                print("true")
-            else:
-                print("false")
+        return _cmd_should_use(manager, args.json)
 
     return 0
 